@@ -5,28 +5,241 @@ Simulated annealing baseline for the DDSC x DQC Quantum Portfolio Challenge.
 Operates on the QUBO energy function. Maintains feasibility by swapping
 a selected asset (1) with an unselected asset (0) at each step.
 
+The annealing loop is JIT-compiled with Numba; the first run pays a one-off
+compile cost, after which the compiled kernel is cached next to this script.
+
 Usage:
     python scripts/baseline_sa.py
     python scripts/baseline_sa.py --instance data/instance.json --iterations 50000 --output submissions/sa_submission.json
+    python scripts/baseline_sa.py --method pt --replicas 8 --swap_every 100
 """
 import argparse
 import json
 import math
 import random
 
+import numba
 import numpy as np
+import orjson
+
+
+# exp(-z) sampled on [0, _EXP_TAB_MAX) for the scalar Metropolis test; the
+# extra final entry is 0, since past the table exp(-z) < 2e-9.
+_EXP_TAB_SIZE = 4096
+_EXP_TAB_MAX = 20.0
+_EXP_TAB_SCALE = _EXP_TAB_SIZE / _EXP_TAB_MAX
+_EXP_TAB = np.append(np.exp(-np.arange(_EXP_TAB_SIZE) / _EXP_TAB_SCALE), 0.0)
+
+
+# Kernels hold the selection vector as a uint64 bitmask (bit i set <=> x_i = 1).
+_MAX_BITS = 64
 
 
 def load_instance(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def energy(x: np.ndarray, mu: np.ndarray, sigma: np.ndarray,
            K: int, lam: float, penalty_A: float) -> float:
-    """Compute QUBO energy E(x) = -mu^T x + lam x^T Sigma x + A(sum(x)-K)^2."""
-    xf = x.astype(float)
-    return -float(mu @ xf) + lam * float(xf @ sigma @ xf) + penalty_A * (xf.sum() - K) ** 2
+    """Compute QUBO energy E(x) = -mu^T x + lam x^T Sigma x + A(sum(x)-K)^2.
+
+    x is used as-is; pass a float64 0/1 vector to avoid dtype conversion.
+    """
+    return -float(mu @ x) + lam * float(x @ sigma @ x) + penalty_A * (x.sum() - K) ** 2
+
+
+def _quadratic_terms(sigma: np.ndarray) -> tuple:
+    """Return (Sigma + Sigma^T, diag(Sigma)) for the swap delta-energy kernels.
+
+    For a swap i -> j, x^T Sigma x changes by
+    (S2 x)[j] - (S2 x)[i] + Sigma[i,i] + Sigma[j,j] - S2[i,j].
+    """
+    S2 = np.ascontiguousarray(sigma + sigma.T)
+    return S2, np.ascontiguousarray(np.diag(sigma))
+
+
+def _pack_bits(indices) -> np.uint64:
+    bits = 0
+    for i in indices:
+        bits |= 1 << int(i)
+    return np.uint64(bits)
+
+
+def _unpack_bits(bits, N: int) -> np.ndarray:
+    return ((np.uint64(bits) >> np.arange(N, dtype=np.uint64)) & np.uint64(1)).astype(int)
+
+
+@numba.njit(cache=True)
+def _swap_bits(bits, i_on, i_off):
+    """Clear bit i_on and set bit i_off."""
+    return bits ^ ((np.uint64(1) << np.uint64(i_on)) | (np.uint64(1) << np.uint64(i_off)))
+
+
+@numba.njit(cache=True)
+def _accept_prob(z):
+    """Table approximation of min(1, exp(-z)).
+
+    z is clamped to [0, _EXP_TAB_MAX] with min/max rather than branches
+    before the integer conversion (so huge z cannot overflow): downhill
+    moves (z < 0) read 1 and far-uphill moves read the trailing 0.
+    """
+    k = int(max(min(z, _EXP_TAB_MAX), 0.0) * _EXP_TAB_SCALE)
+    return _EXP_TAB[k]
+
+
+@numba.njit(cache=True, fastmath=True)
+def _sa_kernel(mu, S2, diag, S2x, bits, ones, zeros, n_ones, lam, current_e,
+               T_sched, seed):
+    """Annealing loop over preallocated arrays; mutates S2x, ones, zeros.
+
+    Returns the best selection as a bitmask.
+
+    S2 = Sigma + Sigma^T is symmetric and C-contiguous, so its column j is the
+    contiguous row S2[j]; S2x = S2 x and diag is the diagonal of Sigma.
+    T_sched[step] is the temperature at each step.
+    """
+    np.random.seed(seed)
+    N = mu.shape[0]
+    n_zeros = N - n_ones
+
+    best_bits = bits
+    best_e = current_e
+    inv_T = 1.0 / np.maximum(T_sched, 1e-12)
+
+    for step in range(T_sched.shape[0]):
+        # Swap: turn off one selected asset, turn on one unselected asset
+        a = np.random.randint(0, n_ones)
+        b = np.random.randint(0, n_zeros)
+        i_on = ones[a]
+        i_off = zeros[b]
+
+        # Cardinality is unchanged by a swap, so the penalty term drops out.
+        delta_quad = (S2x[i_off] - S2x[i_on]
+                      + diag[i_on] + diag[i_off] - S2[i_off, i_on])
+        delta = -(mu[i_off] - mu[i_on]) + lam * delta_quad
+
+        if np.random.random() < _accept_prob(delta * inv_T[step]):
+            # Accept
+            bits = _swap_bits(bits, i_on, i_off)
+            for k in range(N):
+                S2x[k] += S2[i_off, k] - S2[i_on, k]
+            current_e += delta
+            # Proposals are drawn by slot, so the freed slot takes the
+            # incoming index directly: O(1), no position lookup needed.
+            ones[a] = i_off
+            zeros[b] = i_on
+            if current_e < best_e:
+                best_e = current_e
+                best_bits = bits
+
+    return best_bits
+
+
+@numba.njit(cache=True, fastmath=True)
+def _swap_deltas(mu, S2, diag, S2x, ones, zeros, lam, dE):
+    """Fill dE[a, b] with the energy change of swapping ones[a] out for zeros[b]."""
+    for a in range(ones.shape[0]):
+        i_on = ones[a]
+        for b in range(zeros.shape[0]):
+            i_off = zeros[b]
+            delta_quad = (S2x[i_off] - S2x[i_on]
+                          + diag[i_on] + diag[i_off] - S2[i_off, i_on])
+            dE[a, b] = -(mu[i_off] - mu[i_on]) + lam * delta_quad
+
+
+@numba.njit(cache=True, fastmath=True)
+def _sample_swap(mu, S2, diag, S2x, ones, zeros, lam, inv_T, dE):
+    """Fill dE like _swap_deltas and Metropolis-test every candidate in the same pass.
+
+    Returns the slot pair (a, b) of one accepted swap chosen uniformly, or
+    (-1, -1) if every candidate is rejected. A candidate with acceptance
+    probability p is accepted when u < p; conditional on that, u / p is
+    uniform on [0, 1), so the accepted candidate with the largest u / p is
+    a uniform pick from one draw per candidate and no scratch arrays.
+    """
+    best_key = -1.0
+    best_a = -1
+    best_b = -1
+    for a in range(ones.shape[0]):
+        i_on = ones[a]
+        for b in range(zeros.shape[0]):
+            i_off = zeros[b]
+            delta_quad = (S2x[i_off] - S2x[i_on]
+                          + diag[i_on] + diag[i_off] - S2[i_off, i_on])
+            delta = -(mu[i_off] - mu[i_on]) + lam * delta_quad
+            dE[a, b] = delta
+            p = _accept_prob(delta * inv_T)
+            u = np.random.random()
+            key = u / max(p, 1e-300) if u < p else -1.0
+            if key > best_key:
+                best_key = key
+                best_a = a
+                best_b = b
+    return best_a, best_b
+
+
+@numba.njit(cache=True, fastmath=True)
+def _apply_swap(S2, S2x, bits, ones, zeros, a, b):
+    """Swap ones[a] out for zeros[b]; returns the updated bitmask."""
+    i_on = ones[a]
+    i_off = zeros[b]
+    for k in range(S2x.shape[0]):
+        S2x[k] += S2[i_off, k] - S2[i_on, k]
+    ones[a] = i_off
+    zeros[b] = i_on
+    return _swap_bits(bits, i_on, i_off)
+
+
+@numba.njit(cache=True, fastmath=True)
+def _sa_batch_kernel(mu, S2, diag, S2x, bits, ones, zeros, n_ones, lam, current_e,
+                     T_sched, seed):
+    """Batched annealing: score all K*(N-K) swaps every step.
+
+    Each step runs the Metropolis test exp(-max(dE, 0) / T) on every
+    candidate and applies one accepted swap chosen uniformly (none if all
+    are rejected). Once the schedule ends, a zero-temperature steepest
+    descent polishes the final state.
+    """
+    np.random.seed(seed)
+    N = mu.shape[0]
+    n_zeros = N - n_ones
+    dE = np.empty((n_ones, n_zeros))
+
+    best_bits = bits
+    best_ones = ones.copy()
+    best_zeros = zeros.copy()
+    best_S2x = S2x.copy()
+    best_e = current_e
+    inv_T = 1.0 / np.maximum(T_sched, 1e-12)
+
+    for step in range(T_sched.shape[0]):
+        a, b = _sample_swap(mu, S2, diag, S2x, ones, zeros, lam, inv_T[step], dE)
+        if a >= 0:
+            current_e += dE[a, b]
+            bits = _apply_swap(S2, S2x, bits, ones, zeros, a, b)
+            if current_e < best_e:
+                best_e = current_e
+                best_bits = bits
+                best_ones[:] = ones
+                best_zeros[:] = zeros
+                best_S2x[:] = S2x
+
+    # Zero-temperature descent from the best state found
+    bits = best_bits
+    ones[:] = best_ones
+    zeros[:] = best_zeros
+    S2x[:] = best_S2x
+    while True:
+        _swap_deltas(mu, S2, diag, S2x, ones, zeros, lam, dE)
+        m = np.argmin(dE)
+        a = m // n_zeros
+        b = m % n_zeros
+        if dE[a, b] >= 0.0:
+            break
+        bits = _apply_swap(S2, S2x, bits, ones, zeros, a, b)
+
+    return bits
 
 
 def simulated_annealing(
@@ -39,54 +252,205 @@ def simulated_annealing(
     T_start: float = 1.0,
     T_end: float = 1e-4,
     seed: int = 42,
+    moves: str = "single",
+    T_schedule: np.ndarray = None,
 ) -> tuple:
+    """Single-chain annealing from T_start to T_end.
+
+    moves="single" proposes one random swap per step (Metropolis);
+    moves="batch" scores every swap per step and samples among them.
+    T_schedule, if given, is the per-step temperature array and overrides
+    the geometric iterations/T_start/T_end schedule.
+    """
+    if moves not in ("single", "batch"):
+        raise ValueError(f"moves must be 'single' or 'batch', got {moves!r}")
     rng = random.Random(seed)
+    mu = np.ascontiguousarray(mu, dtype=np.float64)
+    sigma = np.ascontiguousarray(sigma, dtype=np.float64)
     N = len(mu)
+    if N > _MAX_BITS:
+        raise ValueError(f"At most {_MAX_BITS} assets are supported, got N={N}.")
 
     # Start with a random feasible solution: exactly K ones
     indices = list(range(N))
     rng.shuffle(indices)
-    x = np.zeros(N, dtype=int)
-    for i in indices[:K]:
-        x[i] = 1
+    x = np.zeros(N)
+    x[indices[:K]] = 1.0
+    ones = np.array(indices[:K], dtype=np.int32)
+    zeros = np.array(indices[K:], dtype=np.int32)
 
-    best_x = x.copy()
-    best_e = energy(x, mu, sigma, K, lam, penalty_A)
-    current_e = best_e
+    # S2x = (Sigma + Sigma^T) x, kept up to date so each swap is scored in
+    # O(1) and applied in O(N) instead of recomputing x^T Sigma x.
+    S2, diag = _quadratic_terms(sigma)
+    S2x = S2 @ x
 
-    cooling_rate = (T_end / T_start) ** (1.0 / iterations)
-    T = T_start
+    if T_schedule is None:
+        T_schedule = np.geomspace(T_start, T_end, iterations)
+    T_schedule = np.ascontiguousarray(T_schedule, dtype=np.float64).reshape(-1)
 
-    ones = [i for i in range(N) if x[i] == 1]
-    zeros = [i for i in range(N) if x[i] == 0]
+    kernel = _sa_batch_kernel if moves == "batch" else _sa_kernel
+    best_bits = kernel(
+        mu, S2, diag, S2x, _pack_bits(ones), ones, zeros, K, lam,
+        energy(x, mu, sigma, K, lam, penalty_A),
+        T_schedule, seed,
+    )
+    best_x = _unpack_bits(best_bits, N)
+    # The kernel tracks energy incrementally; report the exact value.
+    best_e = energy(best_x.astype(np.float64), mu, sigma, K, lam, penalty_A)
 
-    for step in range(iterations):
-        # Swap: turn off one selected asset, turn on one unselected asset
-        i_on = rng.choice(ones)
-        i_off = rng.choice(zeros)
+    return best_x, best_e
 
-        x[i_on] = 0
-        x[i_off] = 1
 
-        new_e = energy(x, mu, sigma, K, lam, penalty_A)
-        delta = new_e - current_e
+@numba.njit(cache=True)
+def _stream_random(streams, s):
+    """Advance xorshift64* stream s in place; return a float64 in [0, 1)."""
+    x = streams[s]
+    x ^= x >> np.uint64(12)
+    x ^= x << np.uint64(25)
+    x ^= x >> np.uint64(27)
+    streams[s] = x
+    return np.float64((x * np.uint64(0x2545F4914F6CDD1D)) >> np.uint64(11)) * 2.0 ** -53
 
-        if delta < 0 or rng.random() < math.exp(-delta / max(T, 1e-12)):
-            # Accept
-            current_e = new_e
-            ones.remove(i_on)
-            ones.append(i_off)
-            zeros.remove(i_off)
-            zeros.append(i_on)
+
+@numba.njit(cache=True, fastmath=True)
+def _metropolis_steps(mu, S2, diag, S2x, bits, ones, zeros, lam, current_e, beta,
+                      n_steps, best_bits, best_e, streams, s):
+    """Run n_steps fixed-temperature swap moves on one replica.
+
+    Draws come from the replica's own stream streams[s]. Mutates S2x, ones,
+    zeros and streams[s] in place; returns the updated
+    (bits, current_e, best_bits, best_e).
+    """
+    N = mu.shape[0]
+    n_ones = ones.shape[0]
+    n_zeros = zeros.shape[0]
+
+    for step in range(n_steps):
+        a = int(_stream_random(streams, s) * n_ones)
+        b = int(_stream_random(streams, s) * n_zeros)
+        i_on = ones[a]
+        i_off = zeros[b]
+
+        delta_quad = (S2x[i_off] - S2x[i_on]
+                      + diag[i_on] + diag[i_off] - S2[i_off, i_on])
+        delta = -(mu[i_off] - mu[i_on]) + lam * delta_quad
+
+        if _stream_random(streams, s) < _accept_prob(beta * delta):
+            bits = _swap_bits(bits, i_on, i_off)
+            for k in range(N):
+                S2x[k] += S2[i_off, k] - S2[i_on, k]
+            current_e += delta
+            ones[a] = i_off
+            zeros[b] = i_on
             if current_e < best_e:
                 best_e = current_e
-                best_x = x.copy()
-        else:
-            # Reject — revert
-            x[i_on] = 1
-            x[i_off] = 0
+                best_bits = bits
+
+    return bits, current_e, best_bits, best_e
+
+
+@numba.njit(cache=True, fastmath=True, parallel=True)
+def _pt_kernel(mu, S2, diag, S2x, bits, ones, zeros, lam, E, betas,
+               iterations, swap_every, streams):
+    """Parallel tempering over R replicas stored row-wise in S2x, ones, zeros.
+
+    bits[r] is replica r's selection bitmask; the best bitmask seen by any
+    replica is returned.
+
+    betas is the inverse-temperature ladder; order[t] is the replica that
+    currently sits at betas[t]. Replicas are stepped concurrently, then
+    neighbouring rungs propose a Metropolis state exchange. streams[r] is
+    replica r's RNG state and streams[R] drives the exchanges, so results
+    do not depend on how prange assigns replicas to threads.
+    """
+    R = bits.shape[0]
+    order = np.arange(R)
+    rank = np.arange(R)
+    best_bits = bits.copy()
+    best_e = E.copy()
+
+    n_blocks = (iterations + swap_every - 1) // swap_every
+    for block in range(n_blocks):
+        n_steps = min(swap_every, iterations - block * swap_every)
+        for r in numba.prange(R):
+            bits[r], E[r], best_bits[r], best_e[r] = _metropolis_steps(
+                mu, S2, diag, S2x[r], bits[r], ones[r], zeros[r], lam, E[r],
+                betas[rank[r]], n_steps, best_bits[r], best_e[r], streams, r,
+            )
 
-        T *= cooling_rate
+        for t in range(R - 1):
+            ri = order[t]
+            rj = order[t + 1]
+            log_p = (betas[t] - betas[t + 1]) * (E[ri] - E[rj])
+            if log_p >= 0.0 or _stream_random(streams, R) < math.exp(log_p):
+                order[t] = rj
+                order[t + 1] = ri
+                rank[ri] = t + 1
+                rank[rj] = t
+
+    return best_bits[np.argmin(best_e)]
+
+
+def simulated_annealing_pt(
+    mu: np.ndarray,
+    sigma: np.ndarray,
+    K: int,
+    lam: float,
+    penalty_A: float,
+    n_replicas: int = 8,
+    beta_min: float = 1.0,
+    beta_max: float = 1e4,
+    iterations: int = 50000,
+    swap_every: int = 100,
+    seed: int = 42,
+) -> tuple:
+    """Parallel tempering: n_replicas chains on a geometric beta ladder.
+
+    Each replica runs `iterations` swap moves; adjacent replicas exchange
+    states every `swap_every` moves. Returns the best (x, energy) seen by
+    any replica.
+    """
+    if n_replicas < 1:
+        raise ValueError(f"n_replicas must be >= 1, got {n_replicas}")
+    if swap_every < 1:
+        raise ValueError(f"swap_every must be >= 1, got {swap_every}")
+    rng = random.Random(seed)
+    mu = np.ascontiguousarray(mu, dtype=np.float64)
+    sigma = np.ascontiguousarray(sigma, dtype=np.float64)
+    N = len(mu)
+    if N > _MAX_BITS:
+        raise ValueError(f"At most {_MAX_BITS} assets are supported, got N={N}.")
+
+    # One random feasible start per replica
+    x = np.zeros((n_replicas, N))
+    ones = np.empty((n_replicas, K), dtype=np.int32)
+    zeros = np.empty((n_replicas, N - K), dtype=np.int32)
+    bits = np.empty(n_replicas, dtype=np.uint64)
+    E = np.empty(n_replicas)
+    for r in range(n_replicas):
+        indices = list(range(N))
+        rng.shuffle(indices)
+        x[r, indices[:K]] = 1.0
+        ones[r] = indices[:K]
+        zeros[r] = indices[K:]
+        bits[r] = _pack_bits(indices[:K])
+        E[r] = energy(x[r], mu, sigma, K, lam, penalty_A)
+    S2, diag = _quadratic_terms(sigma)
+    S2x = x @ S2
+
+    betas = np.geomspace(beta_min, beta_max, n_replicas)
+
+    # Independent xorshift64* states (one per replica plus one for the
+    # exchanges), hashed from the seed so distinct seeds never share streams.
+    streams = np.random.SeedSequence(seed).generate_state(n_replicas + 1, dtype=np.uint64)
+    streams[streams == 0] = 1
+
+    best_bits = _pt_kernel(
+        mu, S2, diag, S2x, bits, ones, zeros, lam, E, betas,
+        iterations, swap_every, streams,
+    )
+    best_x = _unpack_bits(best_bits, N)
+    best_e = energy(best_x.astype(np.float64), mu, sigma, K, lam, penalty_A)
 
     return best_x, best_e
 
@@ -101,25 +465,47 @@ def main():
     ap.add_argument("--T_start", type=float, default=1.0)
     ap.add_argument("--T_end", type=float, default=1e-4)
     ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--method", choices=["sa", "pt"], default="sa",
+                    help="sa: single-chain annealing; pt: parallel tempering "
+                         "on a ladder from 1/T_start to 1/T_end")
+    ap.add_argument("--moves", choices=["single", "batch"], default="single",
+                    help="single: one random swap per step; batch: score all "
+                         "K*(N-K) swaps per step and sample one (--method sa)")
+    ap.add_argument("--replicas", type=int, default=8,
+                    help="Number of replicas for --method pt")
+    ap.add_argument("--swap_every", type=int, default=100,
+                    help="Moves between replica exchanges for --method pt")
     ap.add_argument("--output", default="submissions/sa_submission.json")
     args = ap.parse_args()
 
     inst = load_instance(args.instance)
-    mu = np.array(inst["mu"])
-    sigma = np.array(inst["sigma"])
+    mu = np.ascontiguousarray(inst["mu"], dtype=np.float64)
+    sigma = np.ascontiguousarray(inst["sigma"], dtype=np.float64)
     K = inst["K"]
     lam = inst["lambda"]
     penalty_A = inst["penalty_A"]
     N = len(mu)
 
     print(f"Instance: N={N}, K={K}, lambda={lam}, penalty_A={penalty_A}")
-    print(f"Running SA: {args.iterations} iterations, T={args.T_start}->{args.T_end}, seed={args.seed}")
-
-    best_x, best_e = simulated_annealing(
-        mu=mu, sigma=sigma, K=K, lam=lam, penalty_A=penalty_A,
-        iterations=args.iterations,
-        T_start=args.T_start, T_end=args.T_end, seed=args.seed,
-    )
+    if args.method == "pt":
+        print(f"Running PT: {args.replicas} replicas x {args.iterations} iterations, "
+              f"T={args.T_start}->{args.T_end}, swap_every={args.swap_every}, seed={args.seed}")
+        best_x, best_e = simulated_annealing_pt(
+            mu=mu, sigma=sigma, K=K, lam=lam, penalty_A=penalty_A,
+            n_replicas=args.replicas,
+            beta_min=1.0 / args.T_start, beta_max=1.0 / args.T_end,
+            iterations=args.iterations, swap_every=args.swap_every,
+            seed=args.seed,
+        )
+    else:
+        print(f"Running SA ({args.moves} moves): {args.iterations} iterations, "
+              f"T={args.T_start}->{args.T_end}, seed={args.seed}")
+        best_x, best_e = simulated_annealing(
+            mu=mu, sigma=sigma, K=K, lam=lam, penalty_A=penalty_A,
+            iterations=args.iterations,
+            T_start=args.T_start, T_end=args.T_end, seed=args.seed,
+            moves=args.moves,
+        )
 
     selected = [inst["tickers"][i] for i in range(N) if best_x[i] == 1]
     print(f"\nBest energy: {best_e:.6f}")
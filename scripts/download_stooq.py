@@ -2,23 +2,67 @@
 """
 Download historical daily prices from Stooq for all tickers in the ticker list.
 
+Downloads run on a small thread pool so network round-trips overlap, while a
+shared rate limiter still spaces request starts by --sleep seconds.
+
 Usage:
     python scripts/download_stooq.py
-    python scripts/download_stooq.py --tickers data/tickers.txt --out data/prices
+    python scripts/download_stooq.py --tickers data/tickers.txt --out data/prices --workers 8
 """
 import argparse
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """Keep-alive session for the calling thread (reuses TCP/TLS connections)."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+class RateLimiter:
+    """Space request starts at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+def fetch(ticker: str, out_dir: str, limiter: RateLimiter) -> str:
+    url = f"https://stooq.com/q/d/l/?s={ticker}&i=d"
+    path = os.path.join(out_dir, f"{ticker}.csv")
+    limiter.wait()
+    r = _session().get(url, timeout=30)
+    r.raise_for_status()
+    with open(path, "wb") as w:
+        w.write(r.content)
+    return path
+
 
 def main():
     ap = argparse.ArgumentParser(description="Download Stooq price CSVs")
     ap.add_argument("--tickers", default="data/tickers.txt")
     ap.add_argument("--out", default="data/prices")
     ap.add_argument("--sleep", type=float, default=0.5,
-                    help="Seconds between requests (be polite to Stooq)")
+                    help="Minimum seconds between request starts (be polite to Stooq)")
+    ap.add_argument("--workers", type=int, default=8,
+                    help="Concurrent downloads")
     args = ap.parse_args()
 
     os.makedirs(args.out, exist_ok=True)
@@ -30,18 +74,16 @@ def main():
         ]
 
     print(f"Downloading {len(tickers)} tickers to {args.out}/")
-    for i, t in enumerate(tickers, 1):
-        url = f"https://stooq.com/q/d/l/?s={t}&i=d"
-        path = os.path.join(args.out, f"{t}.csv")
-        try:
-            r = requests.get(url, timeout=30)
-            r.raise_for_status()
-            with open(path, "wb") as w:
-                w.write(r.content)
-            print(f"  [{i}/{len(tickers)}] {t} -> {path}")
-        except requests.RequestException as e:
-            print(f"  [{i}/{len(tickers)}] {t} FAILED: {e}")
-        time.sleep(args.sleep)
+    limiter = RateLimiter(args.sleep)
+    with ThreadPoolExecutor(max_workers=args.workers) as ex:
+        futures = {ex.submit(fetch, t, args.out, limiter): t for t in tickers}
+        for i, fut in enumerate(as_completed(futures), 1):
+            t = futures[fut]
+            try:
+                path = fut.result()
+                print(f"  [{i}/{len(tickers)}] {t} -> {path}")
+            except requests.RequestException as e:
+                print(f"  [{i}/{len(tickers)}] {t} FAILED: {e}")
 
     print("Done.")
 
@@ -14,6 +14,7 @@ Usage:
 import argparse
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List
 
@@ -36,22 +37,35 @@ def load_stooq_csv(path: str) -> pd.DataFrame:
     Stooq CSV commonly has columns: Date, Open, High, Low, Close, Volume.
     We only need Date + Close.
     """
-    df = pd.read_csv(path)
+    # Parse only the columns we keep, in a single pass over the file.
+    df = pd.read_csv(
+        path,
+        usecols=lambda c: c.lower() in ("date", "close", "zamkniecie"),
+        engine="c",
+    )
     cols = {c.lower(): c for c in df.columns}
     date_col = cols.get("date")
     close_col = cols.get("close") or cols.get("zamkniecie")
     if date_col is None or close_col is None:
-        raise ValueError(f"Unexpected columns in {path}: {df.columns.tolist()}")
+        raise ValueError(f"Expected Date and Close columns in {path}, found: {df.columns.tolist()}")
     df = df[[date_col, close_col]].rename(columns={date_col: "Date", close_col: "Close"})
-    df["Date"] = pd.to_datetime(df["Date"])
+    df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
     df = df.sort_values("Date").set_index("Date")
     df["Close"] = pd.to_numeric(df["Close"], errors="coerce")
     df = df.dropna()
     return df
 
 
-def compute_log_returns(prices: pd.Series) -> pd.Series:
-    return np.log(prices).diff().dropna()
+def compute_log_returns(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Log returns for date-aligned closes (one column per ticker).
+    Each column is differenced against its own previous quote, so a ticker
+    missing a date gets the return across the gap, as if diffed on its own.
+    Rows with no return yet (the first quote, missing dates) are left as
+    NaN for the caller to drop after aligning all tickers.
+    """
+    log_p = np.log(prices)
+    return log_p - log_p.ffill().shift(1)
 
 
 def build_instance(
@@ -63,37 +77,46 @@ def build_instance(
     start_date: str = None,
     end_date: str = None,
 ) -> Instance:
-    rets = []
-    kept = []
+    paths = []
     for t in tickers:
         path = os.path.join(price_dir, f"{t}.csv")
         if not os.path.exists(path):
             raise FileNotFoundError(f"Missing price file: {path}")
-        df = load_stooq_csv(path)
+        paths.append(path)
+
+    # Files are independent and pandas releases the GIL while parsing.
+    with ThreadPoolExecutor(max_workers=min(32, len(paths) or 1)) as ex:
+        frames = list(ex.map(load_stooq_csv, paths))
+
+    closes = []
+    kept = []
+    for t, df in zip(tickers, frames):
         if start_date:
             df = df[df.index >= pd.to_datetime(start_date)]
         if end_date:
             df = df[df.index <= pd.to_datetime(end_date)]
-        r = compute_log_returns(df["Close"]).rename(t)
-        rets.append(r)
+        closes.append(df["Close"].rename(t))
         kept.append(t)
 
-    R = pd.concat(rets, axis=1).dropna(how="any")
+    prices = pd.concat(closes, axis=1).sort_index()
+    R = compute_log_returns(prices).dropna(how="any").to_numpy(dtype=float)
     if len(R) < 200:
         raise ValueError(
             f"Too few aligned return rows ({len(R)}). "
             "Expand date range or reduce tickers."
         )
 
-    mu = R.mean().values.astype(float)
-    sigma = R.cov().values.astype(float)
+    mu = R.mean(axis=0)
+    sigma = np.cov(R, rowvar=False)
 
     return Instance(tickers=kept, mu=mu, sigma=sigma, K=K, lam=lam, penalty_A=penalty_A)
 
 
 def energy(x: np.ndarray, inst: Instance) -> float:
-    """Compute QUBO energy E(x) = -mu^T x + lam x^T Sigma x + A(sum(x)-K)^2."""
-    x = x.astype(float)
+    """
+    Compute QUBO energy E(x) = -mu^T x + lam x^T Sigma x + A(sum(x)-K)^2.
+    x is used as-is; pass a float64 0/1 vector (as parse_submission returns).
+    """
     term_ret = -float(inst.mu @ x)
     term_risk = float(inst.lam * (x.T @ inst.sigma @ x))
     term_pen = float(inst.penalty_A * (x.sum() - inst.K) ** 2)
@@ -108,7 +131,7 @@ def parse_submission(path: str, N: int) -> np.ndarray:
         raise ValueError("Submission JSON must contain key 'x'.")
     if isinstance(x, str):
         x = [int(ch) for ch in x.strip()]
-    x = np.array(x, dtype=int).reshape(-1)
+    x = np.array(x, dtype=np.float64).reshape(-1)
     if len(x) != N:
         raise ValueError(f"'x' must have length {N}, got {len(x)}.")
     if not np.all((x == 0) | (x == 1)):
@@ -126,6 +149,8 @@ def write_instance_json(inst: Instance, out_path: str) -> None:
         "sigma": inst.sigma.tolist(),
     }
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    # Stays on the stdlib encoder: orjson formats small floats differently
+    # (0.00005 vs 5e-05), which would change the frozen instance hash.
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump(payload, f, indent=2, sort_keys=True, ensure_ascii=False)
         f.write('\n')
@@ -0,0 +1,166 @@
+"""Regression tests for the simulated annealing baseline.
+
+Checks the Numba kernels in scripts/baseline_sa.py against a brute-force
+solve of the frozen instance.json, plus their helpers and argument
+validation.
+"""
+
+import itertools
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).parent.parent
+INSTANCE_PATH = REPO_ROOT / "instance.json"
+
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+import baseline_sa  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def problem():
+    """instance.json unpacked into the simulated_annealing keyword arguments."""
+    with open(INSTANCE_PATH) as f:
+        inst = json.load(f)
+    return {
+        "mu": np.asarray(inst["mu"], dtype=np.float64),
+        "sigma": np.asarray(inst["sigma"], dtype=np.float64),
+        "K": inst["K"],
+        "lam": inst["lambda"],
+        "penalty_A": inst["penalty_A"],
+    }
+
+
+@pytest.fixture(scope="module")
+def optimum(problem):
+    """Minimum energy over all feasible portfolios, by exhaustive search."""
+    N = len(problem["mu"])
+    combos = np.array(list(itertools.combinations(range(N), problem["K"])))
+    X = np.zeros((len(combos), N))
+    X[np.arange(len(combos))[:, None], combos] = 1.0
+    energies = (
+        -X @ problem["mu"]
+        + problem["lam"] * np.einsum("ij,jk,ik->i", X, problem["sigma"], X)
+    )
+    return energies.min()
+
+
+def assert_feasible(x, K):
+    assert set(np.unique(x)) <= {0, 1}, f"x is not 0/1: {x}"
+    assert int(x.sum()) == K, f"Expected {K} selected assets, got {int(x.sum())}"
+
+
+# ---------------------------------------------------------------------------
+# Helper tests
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("indices, N", [
+    ([], 20),
+    ([0], 20),
+    ([3, 4, 5, 7, 11], 20),
+    ([0, 19], 20),
+    ([0, 31, 32, 63], 64),
+])
+def test_pack_unpack_roundtrip(indices, N):
+    """Packing selected indices into a bitmask and unpacking must round-trip."""
+    x = baseline_sa._unpack_bits(baseline_sa._pack_bits(indices), N)
+    expected = np.zeros(N, dtype=int)
+    expected[indices] = 1
+    np.testing.assert_array_equal(x, expected)
+
+
+@pytest.mark.parametrize("z, expected", [
+    (-np.inf, 1.0),
+    (-1.0, 1.0),
+    (0.0, 1.0),
+    (20.0, 0.0),
+    (5e16, 0.0),
+    (1e20, 0.0),
+    (np.inf, 0.0),
+])
+def test_accept_prob_limits(z, expected):
+    """Downhill moves are always accepted; far-uphill moves never are."""
+    assert baseline_sa._accept_prob(z) == expected
+
+
+def test_accept_prob_matches_exp():
+    """The table lookup stays within one table step of exp(-z)."""
+    step = 1.0 / baseline_sa._EXP_TAB_SCALE
+    for z in np.linspace(0.0, 19.9, 200):
+        p = baseline_sa._accept_prob(z)
+        assert np.exp(-z) * (1 - 1e-12) <= p <= np.exp(-z + step) * (1 + 1e-12)
+
+
+# ---------------------------------------------------------------------------
+# Solver tests
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("moves", ["single", "batch"])
+def test_simulated_annealing_reaches_optimum(problem, optimum, moves):
+    """SA must find the brute-force optimum of instance.json."""
+    x, e = baseline_sa.simulated_annealing(**problem, iterations=20000, moves=moves)
+    assert_feasible(x, problem["K"])
+    assert e == pytest.approx(baseline_sa.energy(x, **problem), abs=1e-15)
+    assert e == pytest.approx(optimum, abs=1e-12)
+
+
+def test_parallel_tempering_reaches_optimum(problem, optimum):
+    """Parallel tempering must find the brute-force optimum of instance.json."""
+    x, e = baseline_sa.simulated_annealing_pt(
+        **problem, n_replicas=4, iterations=5000, swap_every=50,
+    )
+    assert_feasible(x, problem["K"])
+    assert e == pytest.approx(baseline_sa.energy(x, **problem), abs=1e-15)
+    assert e == pytest.approx(optimum, abs=1e-12)
+
+
+def test_parallel_tempering_reproducible(problem):
+    """The same seed must give the same result; replicas use their own streams."""
+    runs = [
+        baseline_sa.simulated_annealing_pt(
+            **problem, n_replicas=6, iterations=40, swap_every=7, seed=3,
+        )
+        for _ in range(2)
+    ]
+    np.testing.assert_array_equal(runs[0][0], runs[1][0])
+    assert runs[0][1] == runs[1][1]
+
+
+@pytest.mark.parametrize("moves", ["single", "batch"])
+def test_custom_schedule_overrides_iterations(problem, moves):
+    """A caller-supplied T_schedule replaces iterations/T_start/T_end."""
+    schedule = np.geomspace(1.0, 1e-4, 5000)
+    x_custom, e_custom = baseline_sa.simulated_annealing(
+        **problem, iterations=1, moves=moves, T_schedule=schedule,
+    )
+    x_default, e_default = baseline_sa.simulated_annealing(
+        **problem, iterations=5000, T_start=1.0, T_end=1e-4, moves=moves,
+    )
+    np.testing.assert_array_equal(x_custom, x_default)
+    assert e_custom == e_default
+
+
+# ---------------------------------------------------------------------------
+# Validation tests
+# ---------------------------------------------------------------------------
+
+
+def test_invalid_moves_rejected(problem):
+    """Unknown move types must raise before any kernel runs."""
+    with pytest.raises(ValueError, match="moves"):
+        baseline_sa.simulated_annealing(**problem, moves="pairs")
+
+
+@pytest.mark.parametrize("kwargs, match", [
+    ({"n_replicas": 0}, "n_replicas"),
+    ({"swap_every": 0}, "swap_every"),
+])
+def test_invalid_pt_arguments_rejected(problem, kwargs, match):
+    """Parallel tempering needs at least one replica and one move per block."""
+    with pytest.raises(ValueError, match=match):
+        baseline_sa.simulated_annealing_pt(**problem, **kwargs)
@@ -0,0 +1,54 @@
+"""Tests for instance construction in scripts/evaluate.py."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+import evaluate  # noqa: E402
+
+
+@pytest.fixture
+def price_dir(tmp_path):
+    """Two Stooq-style CSVs whose trading days have gaps on different dates."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2023-01-02", periods=300)
+    gaps = {"aaa.us": [10, 11, 150], "bbb.us": [40, 151, 152, 260]}
+    for ticker, missing in gaps.items():
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        df = pd.DataFrame({
+            "Date": dates.strftime("%Y-%m-%d"),
+            "Open": close,
+            "High": close,
+            "Low": close,
+            "Close": close,
+            "Volume": 1000,
+        }).drop(index=missing)
+        df.to_csv(tmp_path / f"{ticker}.csv", index=False)
+    return tmp_path
+
+
+def test_build_instance_matches_per_ticker_returns(price_dir):
+    """Aligned log returns must equal per-ticker diff().dropna() + inner join.
+
+    A ticker missing a date keeps its return across the gap, exactly as if
+    its own price series had been differenced before aligning.
+    """
+    tickers = ["aaa.us", "bbb.us"]
+    inst = evaluate.build_instance(
+        str(price_dir), tickers, K=1, lam=0.5, penalty_A=10.0,
+    )
+
+    rets = []
+    for t in tickers:
+        close = evaluate.load_stooq_csv(str(price_dir / f"{t}.csv"))["Close"]
+        rets.append(np.log(close).diff().dropna().rename(t))
+    R = pd.concat(rets, axis=1).dropna(how="any")
+
+    np.testing.assert_allclose(inst.mu, R.mean().values, rtol=1e-12, atol=0)
+    np.testing.assert_allclose(inst.sigma, R.cov().values, rtol=1e-12, atol=0)
@@ -23,6 +23,26 @@ def instance():
         return json.load(f)
 
 
+@pytest.fixture(scope="module")
+def sigma(instance):
+    """Sigma from instance.json as a float64 array."""
+    return np.asarray(instance["sigma"], dtype=np.float64)
+
+
+@pytest.fixture(scope="module")
+def mu(instance):
+    """mu from instance.json as a float64 array."""
+    return np.asarray(instance["mu"], dtype=np.float64)
+
+
+@pytest.fixture(scope="session")
+def instance_hash():
+    """LF-normalized SHA256 of instance.json, computed once per test run."""
+    # Normalize to LF for cross-platform consistency
+    file_bytes = INSTANCE_PATH.read_bytes().replace(b"\r\n", b"\n")
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
 # ---------------------------------------------------------------------------
 # Structure tests
 # ---------------------------------------------------------------------------
@@ -97,38 +117,38 @@ def test_tickers_match(instance):
 # ---------------------------------------------------------------------------
 
 
-def test_sigma_symmetric(instance):
+def test_sigma_symmetric(sigma):
     """Covariance matrix Sigma must be symmetric."""
-    sigma = np.array(instance["sigma"])
     assert np.allclose(sigma, sigma.T), (
         "Sigma is not symmetric: max diff = "
         f"{np.max(np.abs(sigma - sigma.T)):.2e}"
     )
 
 
-def test_sigma_positive_semidefinite(instance):
+def test_sigma_positive_semidefinite(sigma):
     """Covariance matrix Sigma must be positive semi-definite."""
-    sigma = np.array(instance["sigma"])
-    eigenvalues = np.linalg.eigvalsh(sigma)
-    min_eig = eigenvalues.min()
-    assert min_eig >= -1e-10, (
-        f"Sigma is not positive semi-definite: "
-        f"smallest eigenvalue = {min_eig:.2e}"
-    )
+    # Cholesky of Sigma + eps*I succeeds iff all eigenvalues exceed -eps,
+    # without computing the full spectrum.
+    try:
+        np.linalg.cholesky(sigma + 1e-10 * np.eye(len(sigma)))
+    except np.linalg.LinAlgError:
+        min_eig = np.linalg.eigvalsh(sigma).min()
+        pytest.fail(
+            f"Sigma is not positive semi-definite: "
+            f"smallest eigenvalue = {min_eig:.2e}"
+        )
 
 
-def test_mu_reasonable_range(instance):
+def test_mu_reasonable_range(mu):
     """Mean return values must be within a reasonable daily range."""
-    mu = np.array(instance["mu"])
     assert np.all((-1.0 <= mu) & (mu <= 1.0)), (
         f"mu values outside [-1.0, 1.0]: "
         f"min={mu.min():.6f}, max={mu.max():.6f}"
     )
 
 
-def test_sigma_diagonal_positive(instance):
+def test_sigma_diagonal_positive(sigma):
     """Variance (diagonal of Sigma) must be strictly positive."""
-    sigma = np.array(instance["sigma"])
     diag = np.diag(sigma)
     assert np.all(diag > 0), (
         f"Sigma has non-positive diagonal entries: "
@@ -141,7 +161,7 @@ def test_sigma_diagonal_positive(instance):
 # ---------------------------------------------------------------------------
 
 
-def test_hash_integrity(instance):
+def test_hash_integrity(instance_hash):
     """SHA256 of instance.json must match the hash documented in README.md.
 
     Uses LF-normalized bytes so the hash is identical on Windows (CRLF
@@ -155,9 +175,7 @@ def test_hash_integrity(instance):
     assert match, "No SHA256 hash found in README.md"
 
     expected_hash = match.group(1)
-    # Normalize to LF for cross-platform consistency
-    file_bytes = INSTANCE_PATH.read_bytes().replace(b"\r\n", b"\n")
-    actual_hash = hashlib.sha256(file_bytes).hexdigest()
+    actual_hash = instance_hash
     assert actual_hash == expected_hash, (
         f"SHA256 mismatch!\n"
         f"  README says: {expected_hash}\n"
@@ -165,21 +183,15 @@ def test_hash_integrity(instance):
     )
 
 
-def test_json_deterministic(instance):
+def test_json_deterministic(instance, instance_hash):
     """Re-serializing instance.json with sort_keys=True must produce identical content.
 
     Compares with normalized (LF) line endings so the test passes regardless
     of whether git checks out the file with CRLF (Windows) or LF (Unix).
     """
-    file_bytes = INSTANCE_PATH.read_bytes()
-    # Normalize to LF for cross-platform comparison
-    file_normalized = file_bytes.replace(b"\r\n", b"\n")
-    file_hash = hashlib.sha256(file_normalized).hexdigest()
-
-    with open(INSTANCE_PATH) as f:
-        data = json.load(f)
+    file_hash = instance_hash
 
-    reserialized = json.dumps(data, indent=2, sort_keys=True) + "\n"
+    reserialized = json.dumps(instance, indent=2, sort_keys=True) + "\n"
     reserialized_hash = hashlib.sha256(reserialized.encode()).hexdigest()
 
     assert reserialized_hash == file_hash, (